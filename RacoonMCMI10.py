@@ -1,13 +1,342 @@
+import io
 import os
 import json
+import re
+import contextlib
 import zipfile
 import shutil
-import urllib.request
+import socket
+import threading
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait as wait_for_futures
 
-def download_and_install_ftb_pack_from_link(pack_url, minecraft_dir=".", pack_name="FTB_Pack"):
+try:
+    import orjson  # Optional, much faster JSON encoding/decoding
+except ImportError:
+    orjson = None
+
+# Pack folders that belong in the instance's minecraft/ game directory
+GAME_DIR_FOLDERS = ("mods/", "config/", "libraries/")
+
+# Size of the pieces pack.zip is downloaded in; extraction can use each piece as soon as it lands
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# (connect, read) timeout in seconds for pack requests; a stalled request must fail rather than hang the install
+DOWNLOAD_TIMEOUT = (10, 60)
+
+# Largest uncompressed size accepted for a single pack entry, far above any real mod or config
+MAX_ENTRY_SIZE = 2 * 1024 ** 3
+
+def _create_session(retries=Retry(total=3, backoff_factor=0.5)):
+    """
+    Creates a requests.Session with a connection pool and retries, so repeated downloads reuse sockets and TLS sessions.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _download_segment(session, url, dest, lo, hi):
+    """
+    Downloads bytes lo..hi (inclusive) of url into the same region of dest.
+
+    Returns:
+        bool: False if the server ignored the Range header, True otherwise.
+    """
+    # Ask for the bytes as stored, so decoded data never lands at the wrong offsets
+    headers = {'Range': f'bytes={lo}-{hi}', 'Accept-Encoding': 'identity'}
+    with session.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        response.raise_for_status()
+        if response.status_code == 200:
+            return False
+        with open(dest, 'r+b') as f:
+            f.seek(lo)
+            for chunk in response.iter_content(chunk_size=256 * 1024):
+                f.write(chunk)
+    return True
+
+def _preallocate(path, size):
+    """
+    Creates path with size bytes reserved up front, so the filesystem can lay it out in one contiguous extent.
+    Falls back to a sparse ftruncate where posix_fallocate is unavailable (Windows, macOS) or unsupported.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError):
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+class _DownloadProgress:
+    """
+    Tracks which chunks of a file downloading in the background are on disk, so readers can wait for the bytes they need.
+    """
+
+    def __init__(self, size, chunk_size=DOWNLOAD_CHUNK_SIZE):
+        self.size = size
+        self.chunks = [(index, lo, min(lo + chunk_size, size) - 1) for index, lo in enumerate(range(0, size, chunk_size))]
+        self.chunk_size = chunk_size
+        self.error = None
+        self._done = [False] * len(self.chunks)
+        self._futures = []
+        self._condition = threading.Condition()
+
+    def track(self, future, index):
+        """
+        Marks chunk index done when future (a _download_segment call) completes, or fails the download.
+        """
+        def finished(future):
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self.fail(future.exception())
+            elif not future.result():
+                self.fail(RuntimeError("The server stopped honouring HTTP Range requests"))
+            else:
+                self.mark_done(index)
+
+        self._futures.append(future)
+        future.add_done_callback(finished)
+
+    def mark_done(self, index):
+        with self._condition:
+            self._done[index] = True
+            self._condition.notify_all()
+
+    def fail(self, error):
+        """
+        Records a download error, wakes up every reader and skips the chunks that have not started yet.
+        """
+        with self._condition:
+            if self.error is None:
+                self.error = error
+            self._condition.notify_all()
+        self.cancel()
+
+    def cancel(self):
+        """
+        Skips the chunks that have not started downloading yet.
+        """
+        for future in self._futures:
+            future.cancel()
+
+    def wait(self, lo, hi):
+        """
+        Blocks until bytes lo..hi-1 are on disk.
+        """
+        first, last = lo // self.chunk_size, (hi - 1) // self.chunk_size
+        with self._condition:
+            self._condition.wait_for(lambda: self.error is not None or all(self._done[first:last + 1]))
+            if self.error is not None:
+                raise RuntimeError(f"Download failed: {self.error}")
+
+    def join(self):
+        """
+        Waits for the download to finish, raising the error it failed with, if any.
+        """
+        wait_for_futures(self._futures)
+        if self.error is not None:
+            raise self.error
+
+class _DownloadingFile(io.RawIOBase):
+    """
+    Read-only view of a file that is still downloading. Reads block until the requested bytes have arrived.
+    """
+
+    def __init__(self, path, progress):
+        self._file = open(path, 'rb', buffering=0)
+        self._progress = progress
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def readinto(self, b):
+        pos = self._file.tell()
+        n = min(len(b), self._progress.size - pos)
+        if n <= 0:
+            return 0
+        self._progress.wait(pos, pos + n)
+        return self._file.readinto(memoryview(b)[:n])
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+def _parallel_download(session, url, dest, n=6):
+    """
+    Starts downloading url into dest in chunks, using n parallel HTTP Range requests, and returns once it is under way.
+    Falls back to a single-stream download, finished before returning, if the server does not support ranges.
+
+    Args:
+        session (requests.Session): Session used for the requests.
+        url (str): URL of the file to download.
+        dest (Path): Destination file path.
+        n (int, optional): Number of parallel requests. Defaults to 6.
+
+    Returns:
+        _DownloadProgress: Progress of the running download, or None if the file was downloaded in one go.
+    """
+    head = session.head(url, allow_redirects=True, timeout=DOWNLOAD_TIMEOUT)
+    size = int(head.headers.get('Content-Length', 0))
+    if head.ok and head.headers.get('Accept-Ranges') == 'bytes' and size > 0:
+        # Pre-allocate the file so every chunk can be written into its own region
+        _preallocate(dest, size)
+        progress = _DownloadProgress(size)
+
+        # Fetch the last chunk first: it holds the zip central directory, and proves the server honours ranges
+        index, lo, hi = progress.chunks[-1]
+        if _download_segment(session, head.url, dest, lo, hi):
+            progress.mark_done(index)
+            executor = ThreadPoolExecutor(max_workers=n)
+            for index, lo, hi in progress.chunks[:-1]:
+                if progress.error is not None:
+                    break
+                progress.track(executor.submit(_download_segment, session, head.url, dest, lo, hi), index)
+            executor.shutdown(wait=False)
+            return progress
+
+    # The HEAD failed, the server does not support ranges, or it answered 200 instead of 206, so fetch the file in one go
+    with session.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        with open(dest, 'wb') as f:
+            shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+    return None
+
+def _safe_path(dest_dir, name):
+    """
+    Joins a zip entry name onto dest_dir, refusing names that would escape it (zip-slip).
+    The check is lexical, so it costs no filesystem calls per entry; dest_dir should already be resolved.
+    """
+    normalized = os.path.normpath(name)
+    if (os.path.isabs(normalized) or os.path.splitdrive(normalized)[0]
+            or normalized == os.pardir or normalized.startswith(os.pardir + os.sep)):
+        raise ValueError(f"Unsafe path in archive: {name}")
+    return dest_dir / normalized
+
+@contextlib.contextmanager
+def _open_zip(zip_file_path, progress=None):
+    """
+    Opens a zip archive through a 4 MiB read buffer, so decompression is fed by few large reads.
+    If progress is given, the archive is still downloading and reads wait for the bytes they need.
+    """
+    raw = open(zip_file_path, 'rb', buffering=0) if progress is None else _DownloadingFile(zip_file_path, progress)
+    with io.BufferedReader(raw, buffer_size=4 * 1024 * 1024) as f:
+        with zipfile.ZipFile(f, allowZip64=True) as zip_ref:
+            yield zip_ref
+
+def _extract_member(zip_ref, info, path):
+    """
+    Extracts a single file entry to path, whose parent folder must already exist.
+    Copies in 256 KiB chunks through a 1 MiB write buffer.
+    """
+    with zip_ref.open(info) as src:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+        with os.fdopen(fd, 'wb', buffering=1024 * 1024) as dst:
+            shutil.copyfileobj(src, dst, length=256 * 1024)
+
+def _extract_all(zip_file_path, files, progress=None):
+    """
+    Extracts (ZipInfo, target path) pairs on a thread pool, largest first so a big entry never finishes last.
+    While the archive is still downloading, entries go in archive order instead, following the download.
+    Every worker opens its own ZipFile handle once, since a single handle must not be shared between threads.
+    """
+    local = threading.local()
+    with contextlib.ExitStack() as stack:
+        def extract(info, path):
+            if not hasattr(local, "zip_ref"):
+                local.zip_ref = stack.enter_context(_open_zip(zip_file_path, progress))
+            _extract_member(local.zip_ref, info, path)
+
+        # Start entries of 1 MiB and up biggest first; keep the small ones in archive order
+        # so consecutive reads still hit each worker's read buffer
+        def priority(item):
+            info = item[0]
+            if progress is not None:
+                return (0, info.header_offset)
+            return (-info.file_size if info.file_size >= 1024 * 1024 else 0, info.header_offset)
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [executor.submit(extract, info, path) for info, path in sorted(files, key=priority)]
+            for future in futures:
+                future.result()
+
+def _extract_pack(zip_file_path, dest_dir, progress=None):
+    """
+    Extracts the pack into dest_dir, writing mods, configs and libraries straight into minecraft/.
+    If progress is given, the pack is still downloading and each entry is extracted as soon as its bytes are on disk.
+    """
+    dest_dir = dest_dir.resolve()
+    with _open_zip(zip_file_path, progress) as zip_ref:
+        files = []
+        for info in zip_ref.infolist():
+            if info.filename.startswith(GAME_DIR_FOLDERS):
+                info.filename = "minecraft/" + info.filename
+            if info.is_dir():
+                _safe_path(dest_dir, info.filename).mkdir(parents=True, exist_ok=True)
+            elif info.file_size > MAX_ENTRY_SIZE:
+                raise ValueError(f"Archive entry {info.filename} is too large ({info.file_size} bytes)")
+            else:
+                files.append((info, _safe_path(dest_dir, info.filename)))
+
+    # Create each parent folder once, shallowest first, so workers never race each other creating them
+    for parent in sorted({path.parent for _, path in files}, key=lambda parent: len(parent.parts)):
+        parent.mkdir(parents=True, exist_ok=True)
+
+    _extract_all(zip_file_path, files, progress)
+
+def _load_profiles(profiles_path):
+    """
+    Reads launcher_profiles.json, starting fresh if it is missing and backing it up if it is corrupt.
+    """
+    try:
+        if orjson is not None:
+            return orjson.loads(profiles_path.read_bytes())
+        with open(profiles_path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"profiles": {}, "settings": {}, "version": 2}
+    except json.JSONDecodeError:  # orjson.JSONDecodeError is a subclass
+        print("Error decoding launcher_profiles.json. Backing up the file and creating a new one.")
+        shutil.copyfile(profiles_path, str(profiles_path) + ".bak")
+        return {"profiles": {}, "settings": {}, "version": 2}
+
+def _write_json(path, data):
+    """
+    Writes data as JSON to path atomically, so a crash mid-write never leaves a truncated file behind.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, 'wb' if orjson is not None else 'w') as f:
+            if orjson is not None:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                json.dump(data, f, indent=4)
+            # Make sure the data is on disk before the rename, or a power loss can leave an empty file
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+def download_and_install_ftb_pack_from_link(pack_url, minecraft_dir=".", pack_name="FTB_Pack", profile_version=None):
     """
     Downloads, extracts, and installs an FTB modpack from a direct download link into the vanilla Minecraft launcher directory.
 
@@ -15,8 +344,12 @@ def download_and_install_ftb_pack_from_link(pack_url, minecraft_dir=".", pack_na
         pack_url (str): URL of the FTB pack zip file. Must be a direct download link ending with .zip.
         minecraft_dir (str, optional):  Path to the Minecraft directory. Defaults to ".".
         pack_name (str, optional): Name of the modpack.  Will be used for the profile name. Defaults to "FTB_Pack".
+        profile_version (str, optional): Minecraft version for the launcher profile. Prompted for up front if not given.
     """
 
+    if profile_version is None:
+        profile_version = str(input("Input Minecraft version for modpack: "))
+
     # Ensure pack_url is a direct download link
     if not pack_url.endswith(".zip") or not pack_url.startswith("http"):
         print("Invalid direct download link. Please provide a URL ending with .zip.")
@@ -34,68 +367,48 @@ def download_and_install_ftb_pack_from_link(pack_url, minecraft_dir=".", pack_na
     # 1. Download the FTB pack
     print(f"Downloading FTB pack from {pack_url}...")
     zip_file_path = pack_instance_dir / "pack.zip"
-    try:
-        urllib.request.urlretrieve(pack_url, zip_file_path)
-    except Exception as e:
-        print(f"Error downloading pack: {e}")
-        return
+    # Retry transient server errors and rate limiting, since one pack is a single big download
+    retries = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+    with _create_session(retries) as session:
+        try:
+            progress = _parallel_download(session, pack_url, zip_file_path)
+        except Exception as e:
+            print(f"Error downloading pack: {e}")
+            return
+
+        # 2. Extract the FTB pack, entry by entry as the download brings them in
+        print("Extracting FTB pack...")
+        extract_error = None
+        try:
+            _extract_pack(zip_file_path, pack_instance_dir, progress)
+        except Exception as e:
+            extract_error = e
+            if progress is not None:
+                progress.cancel()
+
+        if progress is not None:
+            try:
+                progress.join()
+            except Exception as e:
+                print(f"Error downloading pack: {e}")
+                return
 
-    # 2. Extract the FTB pack
-    print("Extracting FTB pack...")
-    try:
-        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-            zip_ref.extractall(pack_instance_dir)
-    except Exception as e:
-        print(f"Error extracting pack: {e}")
+    if extract_error is not None:
+        print(f"Error extracting pack: {extract_error}")
         return
 
-    # 3. Move mods, configs, etc. to the correct locations (if needed)
-    mods_source_dir = pack_instance_dir / "mods"
-    config_source_dir = pack_instance_dir / "config"
-    mods_target_dir = pack_instance_dir / "minecraft" / "mods"
-    config_target_dir = pack_instance_dir / "minecraft" / "config"
-
-    # Create directories if they don't exist
-    (pack_instance_dir / "minecraft").mkdir(parents=True, exist_ok=True)
-    mods_target_dir.mkdir(parents=True, exist_ok=True)
-    config_target_dir.mkdir(parents=True, exist_ok=True)
-
-    if mods_source_dir.exists():
-        print("Moving mods...")
-        for item in mods_source_dir.iterdir():
-            shutil.move(str(item), str(mods_target_dir))
-
-    if config_source_dir.exists():
-        print("Moving configs...")
-        for item in config_source_dir.iterdir():
-            shutil.move(str(item), str(config_target_dir))
-
-    # Create a libraries folder if necessary
-    libraries_source_dir = pack_instance_dir / "libraries"
-    libraries_target_dir = pack_instance_dir / "minecraft" / "libraries"
-    libraries_target_dir.mkdir(parents=True, exist_ok=True)
-    if libraries_source_dir.exists():
-        print("Moving libraries...")
-        for item in libraries_source_dir.iterdir():
-            shutil.move(str(item), str(libraries_target_dir))
+    # 3. Make sure the game directory layout exists even if the pack ships no mods, configs or libraries
+    for folder in GAME_DIR_FOLDERS:
+        (pack_instance_dir / "minecraft" / folder).mkdir(parents=True, exist_ok=True)
 
     # 4. Create or update the launcher_profiles.json file
     print("Updating launcher profile...")
-    try:
-        with open(profiles_path, 'r') as f:
-            profiles_data = json.load(f)
-    except FileNotFoundError:
-        profiles_data = {"profiles": {}, "settings": {}, "version": 2}
-    except json.JSONDecodeError:
-        print("Error decoding launcher_profiles.json. Backing up the file and creating a new one.")
-        shutil.copyfile(profiles_path, str(profiles_path) + ".bak")
-        profiles_data = {"profiles": {}, "settings": {}, "version": 2}
+    profiles_data = _load_profiles(profiles_path)
 
     # Unique ID for the new profile
     profile_id = f"{pack_name}"
-    profile_version = str(input("Input Minecraft version for modpack: "))
 
-    profiles_data["profiles"][profile_id] = {
+    new_profile = {
         "name": pack_name,
         "type": "custom",
         "created": "2024-01-01T00:00:00.000Z",
@@ -107,92 +420,280 @@ def download_and_install_ftb_pack_from_link(pack_url, minecraft_dir=".", pack_na
         "gameDir": str(pack_instance_dir / "minecraft")
     }
 
-    try:
-        with open(profiles_path, 'w') as f:
-            json.dump(profiles_data, f, indent=4)
-    except Exception as e:
-        print(f"Error writing to launcher_profiles.json: {e}")
-        return
+    # Leave the file untouched when re-running with the same settings
+    if profiles_data["profiles"].get(profile_id) == new_profile:
+        print("Launcher profile is already up to date.")
+    else:
+        profiles_data["profiles"][profile_id] = new_profile
+        try:
+            _write_json(profiles_path, profiles_data)
+        except Exception as e:
+            print(f"Error writing to launcher_profiles.json: {e}")
+            return
 
     print(f"FTB pack '{pack_name}' installed successfully! Launch Minecraft and select the '{pack_name}' profile.")
 
-def download_and_install_ftb_pack_from_html(html_file_path, minecraft_dir=".", pack_name="FTB_Pack"):
+def _fast_copy(src, dst):
     """
-    Installs mods from a local HTML file into the vanilla Minecraft launcher directory.
+    Copies src to dst inside the kernel with os.copy_file_range where available,
+    falling back to a 256 KiB buffered copy. Preserves metadata like shutil.copy2.
+    """
+    # Opening dst for writing would truncate src if they are the same file
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    with open(src, 'rb') as sf, open(dst, 'wb') as df:
+        size = remaining = os.fstat(sf.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(sf.fileno(), df.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except (AttributeError, OSError):
+            remaining = size  # Not supported on this platform or filesystem
+
+        if remaining == size:
+            # Nothing went through the kernel (unsupported, a filesystem that returns 0 up front,
+            # or a size-less file such as those in /proc), so start over in userspace
+            sf.seek(0)
+            df.seek(0)
+            df.truncate()
+            shutil.copyfileobj(sf, df, length=256 * 1024)
+        elif remaining > 0:
+            raise OSError(f"Copying {src} stopped after {size - remaining} of {size} bytes")
+    shutil.copystat(src, dst)
+
+def _prefetch_dns(links):
+    """
+    Resolves every download host in parallel before the downloads start.
+    This warms the operating system's resolver cache, so the first request to each host skips the DNS lookup.
+    """
+    hosts = {urlparse(link).hostname for link in links if link.startswith('http')} - {None}
 
-    Args:
-        html_file_path (str): Path to the local HTML file containing mod links.
-        minecraft_dir (str, optional):  Path to the Minecraft directory. Defaults to ".".
-        pack_name (str, optional): Name of the modpack.  Will be used for the profile name. Defaults to "FTB_Pack".
+    def resolve(host):
+        try:
+            socket.getaddrinfo(host, None)
+        except OSError:
+            pass  # The download itself will report the failure
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(resolve, hosts))
+
+def _response_validator(response):
+    """
+    Returns a validator usable in If-Range for response: its strong ETag, else its Last-Modified date, else None.
     """
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
 
-    # Parse the local HTML file
+def _part_validator(part_path, part_info_path, link):
+    """
+    Returns the validator recorded when part_path was started for link, or None if it cannot be resumed safely.
+    """
+    if not part_path.exists():
+        return None
     try:
-        with open(html_file_path, 'r', encoding='utf-8') as file:
-            soup = BeautifulSoup(file, 'html.parser')
-    except Exception as e:
-        print(f"Error parsing HTML file: {e}")
-        return
+        with open(part_info_path, 'r') as f:
+            part_info = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if part_info.get("url") != link:
+        return None
+    return part_info.get("validator")
+
+def _content_range(response):
+    """
+    Parses the Content-Range header of a 206 response.
 
-    # Find all links on the page
-    mod_links = []
-    for link in soup.find_all('a'):
-        href = link.get('href')
-        if href and (href.endswith('.jar') or href.endswith('.zip')):
-            mod_links.append(href)
+    Returns:
+        tuple: (first byte, total size), each None if the header is missing or does not say.
+    """
+    match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', response.headers.get('Content-Range', ''))
+    if match is None:
+        return None, None
+    total = match.group(2)
+    return int(match.group(1)), None if total == '*' else int(total)
 
-    # Download mods
-    minecraft_path = Path(minecraft_dir).expanduser().resolve()
-    mods_dir = minecraft_path / "mods"
-    mods_dir.mkdir(parents=True, exist_ok=True)
+def _fetch_one(session, link, mods_dir, lock, manifest):
+    """
+    Copies or downloads a single mod into the mods directory.
+    Skips downloads whose file is already present with the same ETag or size as on the server.
 
-    for link in mod_links:
+    Args:
+        session (requests.Session): Session used for HTTP downloads.
+        link (str): Local file path or URL of the mod.
+        mods_dir (Path): Destination mods directory.
+        lock (threading.Lock): Lock guarding the destination file.
+        manifest (dict): Maps file names to the URL and ETag they were downloaded with. Updated in place.
+    """
+    with lock:
         # Check if the link is a local file path or a URL
         if os.path.isfile(link):
             # If it's a local file path, copy the file to the mods directory
             try:
-                shutil.copy2(link, mods_dir)
+                _fast_copy(link, mods_dir / Path(link).name)
+                manifest.pop(Path(link).name, None)
                 print(f"Mod copied from {link} to {mods_dir}")
             except Exception as e:
                 print(f"Error copying mod from {link}: {e}")
         elif link.startswith('http'):
             # If it's a URL, download the file
             try:
-                print(f"Downloading mod from {link}...")
-                response = requests.get(link, stream=True)
-                if response.status_code == 200:
-                    file_name = Path(link).name
-                    file_path = mods_dir / file_name
-                    with open(file_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=1024):
-                            if chunk:
-                                f.write(chunk)
-                    print(f"Mod {file_name} downloaded successfully!")
+                file_name = Path(link).name
+                file_path = mods_dir / file_name
+                headers = {}
+                if file_path.exists():
+                    # A HEAD works even on servers that ignore conditional GETs
+                    head = session.head(link, allow_redirects=True, timeout=DOWNLOAD_TIMEOUT)
+                    entry = manifest.get(file_name)
+                    # An error page's headers say nothing about the mod, so only trust a successful HEAD
+                    same_etag = entry is not None and entry["url"] == link and head.headers.get('ETag') == entry["etag"]
+                    if head.ok and (same_etag or file_path.stat().st_size == int(head.headers.get('Content-Length', -1))):
+                        print(f"Mod {file_name} is already present, skipping.")
+                        return
+
+                # Download into a .part file and pick up where an interrupted run left off. The
+                # sidecar records which file on the server the .part holds the start of.
+                part_path = file_path.with_name(file_name + ".part")
+                part_info_path = file_path.with_name(file_name + ".part.json")
+                validator = _part_validator(part_path, part_info_path, link)
+                offset = part_path.stat().st_size if validator else 0
+                headers['Accept-Encoding'] = 'identity'
+                if offset:
+                    print(f"Resuming download of {file_name} at byte {offset}...")
+                    headers['Range'] = f'bytes={offset}-'
+                    # If the file changed since the .part was started, the server sends all of it with a 200
+                    headers['If-Range'] = validator
                 else:
-                    print(f"Failed to download mod from {link}. Status code: {response.status_code}")
+                    print(f"Downloading mod from {link}...")
+
+                response = session.get(link, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT)
+                if offset and (response.status_code == 416
+                               or response.status_code == 206 and _content_range(response)[0] != offset):
+                    # The partial file does not fit the file on the server any more, so start over
+                    response.close()
+                    part_path.unlink()
+                    offset = 0
+                    del headers['Range'], headers['If-Range']
+                    response = session.get(link, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT)
+
+                with response:
+                    if response.status_code in (200, 206):
+                        if response.status_code == 200:
+                            # A fresh start (or the server ignored the Range header): remember what we are downloading
+                            offset = 0
+                            length = response.headers.get('Content-Length')
+                            expected = int(length) if length is not None and 'Content-Encoding' not in response.headers else None
+                            new_validator = _response_validator(response)
+                            if new_validator:
+                                _write_json(part_info_path, {"url": link, "validator": new_validator})
+                            elif part_info_path.exists():
+                                part_info_path.unlink()
+                        else:
+                            expected = _content_range(response)[1]
+                        # Let urllib3 undo any gzip/deflate transfer encoding, then copy in large chunks
+                        response.raw.decode_content = True
+                        with open(part_path, 'ab' if offset else 'wb') as f:
+                            shutil.copyfileobj(response.raw, f, length=256 * 1024)
+
+                        size = part_path.stat().st_size
+                        if expected is not None and size < expected:
+                            print(f"Download of {file_name} is incomplete. Run the installer again to resume it.")
+                            return
+                        if expected is not None and size > expected:
+                            part_path.unlink()
+                            print(f"Download of {file_name} is larger than the server reported and was discarded.")
+                            return
+                        os.replace(part_path, file_path)
+                        if part_info_path.exists():
+                            part_info_path.unlink()
+                        if 'ETag' in response.headers:
+                            manifest[file_name] = {"url": link, "etag": response.headers['ETag']}
+                        else:
+                            manifest.pop(file_name, None)
+                        print(f"Mod {file_name} downloaded successfully!")
+                    else:
+                        print(f"Failed to download mod from {link}. Status code: {response.status_code}")
             except Exception as e:
                 print(f"Error downloading mod from {link}: {e}")
         else:
             print(f"Unsupported link type: {link}")
 
+def download_and_install_ftb_pack_from_html(html_file_path, minecraft_dir=".", pack_name="FTB_Pack", profile_version=None):
+    """
+    Installs mods from a local HTML file into the vanilla Minecraft launcher directory.
+
+    Args:
+        html_file_path (str): Path to the local HTML file containing mod links.
+        minecraft_dir (str, optional):  Path to the Minecraft directory. Defaults to ".".
+        pack_name (str, optional): Name of the modpack.  Will be used for the profile name. Defaults to "FTB_Pack".
+        profile_version (str, optional): Minecraft version for the launcher profile. Prompted for up front if not given.
+    """
+
+    if profile_version is None:
+        profile_version = str(input("Input Minecraft version for modpack: "))
+
+    # Only this installer parses HTML, so bs4 (slow to import) is loaded here rather than at startup
+    from bs4 import BeautifulSoup
+
+    # Parse the local HTML file
+    try:
+        with open(html_file_path, 'r', encoding='utf-8') as file:
+            soup = BeautifulSoup(file, 'lxml')
+    except Exception as e:
+        print(f"Error parsing HTML file: {e}")
+        return
+
+    # Find all mod links on the page
+    mod_links = [a['href'] for a in soup.select('a[href$=".jar"], a[href$=".zip"]')]
+
+    # Download mods
+    minecraft_path = Path(minecraft_dir).expanduser().resolve()
+    mods_dir = minecraft_path / "mods"
+    mods_dir.mkdir(parents=True, exist_ok=True)
+
+    # Drop repeated links (keeping their order), then group them by host so
+    # consecutive requests reuse the same pooled connection
+    mod_links = sorted(dict.fromkeys(mod_links), key=lambda link: urlparse(link).netloc)
+
+    # ETags of previous downloads, so re-runs only fetch mods that changed
+    manifest_path = mods_dir / ".manifest.json"
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+
+    # One lock per destination file name, so two links to the same file never write it at once
+    locks = {Path(link).name: threading.Lock() for link in mod_links}
+
+    _prefetch_dns(mod_links)
+
+    session = _create_session()
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            futures = [executor.submit(_fetch_one, session, link, mods_dir, locks[Path(link).name], manifest) for link in mod_links]
+            for done, _ in enumerate(as_completed(futures), start=1):
+                print(f"Processed {done}/{len(futures)} mods")
+    finally:
+        session.close()
+
+    try:
+        _write_json(manifest_path, manifest)
+    except Exception as e:
+        print(f"Error writing {manifest_path}: {e}")
+
     # Create or update the launcher_profiles.json file
     print("Updating launcher profile...")
     profiles_path = minecraft_path / "launcher_profiles.json"
-    try:
-        with open(profiles_path, 'r') as f:
-            profiles_data = json.load(f)
-    except FileNotFoundError:
-        profiles_data = {"profiles": {}, "settings": {}, "version": 2}
-    except json.JSONDecodeError:
-        print("Error decoding launcher_profiles.json. Backing up the file and creating a new one.")
-        shutil.copyfile(profiles_path, str(profiles_path) + ".bak")
-        profiles_data = {"profiles": {}, "settings": {}, "version": 2}
+    profiles_data = _load_profiles(profiles_path)
 
     # Unique ID for the new profile
     profile_id = f"{pack_name}"
-    profile_version = str(input("Input Minecraft version for modpack: "))
 
-    profiles_data["profiles"][profile_id] = {
+    new_profile = {
         "name": pack_name,
         "type": "custom",
         "created": "2024-01-01T00:00:00.000Z",
@@ -204,12 +705,16 @@ def download_and_install_ftb_pack_from_html(html_file_path, minecraft_dir=".", p
         "gameDir": str(minecraft_path)  # Use the main Minecraft directory
     }
 
-    try:
-        with open(profiles_path, 'w') as f:
-            json.dump(profiles_data, f, indent=4)
-    except Exception as e:
-        print(f"Error writing to launcher_profiles.json: {e}")
-        return
+    # Leave the file untouched when re-running with the same settings
+    if profiles_data["profiles"].get(profile_id) == new_profile:
+        print("Launcher profile is already up to date.")
+    else:
+        profiles_data["profiles"][profile_id] = new_profile
+        try:
+            _write_json(profiles_path, profiles_data)
+        except Exception as e:
+            print(f"Error writing to launcher_profiles.json: {e}")
+            return
 
     print(f"Mods installed successfully! Launch Minecraft and select the '{pack_name}' profile.")
 
@@ -221,16 +726,17 @@ def main():
     choice = input("Enter your choice (1/2): ")
 
     pack_name = str(input("Input pack name: "))
+    profile_version = str(input("Input Minecraft version for modpack: "))
     minecraft_dir = "~/.minecraft"
 
     if choice == "1":
         print("To download a modpack, you need a direct download link ending with .zip.")
         print("You can obtain this link by using tools like the Minecraft Serverpack Installer script or by manually downloading the modpack from CurseForge and then providing the direct link to the downloaded zip file.")
         pack_url = input("Input direct download URL (ending with .zip): ")
-        download_and_install_ftb_pack_from_link(pack_url, minecraft_dir, pack_name)
+        download_and_install_ftb_pack_from_link(pack_url, minecraft_dir, pack_name, profile_version)
     elif choice == "2":
         html_file_path = input("Input the path to the local HTML file: ")
-        download_and_install_ftb_pack_from_html(html_file_path, minecraft_dir, pack_name)
+        download_and_install_ftb_pack_from_html(html_file_path, minecraft_dir, pack_name, profile_version)
     else:
         print("Invalid choice. Please choose again.")
 